@@ -0,0 +1,174 @@
+package main
+
+import (
+	"crypto/sha256"
+	"encoding/hex"
+	"encoding/json"
+	"os"
+	"path/filepath"
+	"time"
+)
+
+const (
+	// idCacheTTL is how long cached workspace and user IDs are trusted
+	idCacheTTL = 30 * 24 * time.Hour
+
+	// defaultProjectsCacheTTL is how long the cached project list is reused
+	// unless overridden with -projects-ttl
+	defaultProjectsCacheTTL = 24 * time.Hour
+
+	// entriesCacheTTL is how long an index of existing entries is reused.
+	// It only ever proves there is nothing to add; any entry about to be
+	// created is first checked against Clockify
+	entriesCacheTTL = 5 * time.Minute
+)
+
+// cacheData is the on-disk representation of the per-API-key cache.
+type cacheData struct {
+	WorkspaceID     string    `json:"workspace_id"`
+	UserID          string    `json:"user_id"`
+	IDsFetched      time.Time `json:"ids_ts"`
+	Projects        []Project `json:"projects"`
+	ProjectsFetched time.Time `json:"projects_ts"`
+
+	// Entries maps an entriesCacheKey to the dates that already have an entry
+	Entries map[string]entriesIndex `json:"entries,omitempty"`
+}
+
+// entriesIndex records which dates had an entry when the range was fetched.
+type entriesIndex struct {
+	Dates   []string  `json:"dates"`
+	Fetched time.Time `json:"ts"`
+}
+
+// apiCache persists rarely-changing API lookups between runs. It is best
+// effort: a missing or unreadable cache simply behaves as empty.
+type apiCache struct {
+	path string
+	data cacheData
+}
+
+// loadCache opens the cache file for the given API key, keyed by a hash of
+// the key so the key itself is never written to disk.
+func loadCache(apiKey string) *apiCache {
+	dir, err := os.UserCacheDir()
+	if err != nil {
+		return &apiCache{}
+	}
+
+	return loadCacheFrom(dir, apiKey)
+}
+
+// loadCacheFrom is loadCache with an explicit base cache directory.
+func loadCacheFrom(dir, apiKey string) *apiCache {
+	c := &apiCache{}
+
+	sum := sha256.Sum256([]byte(apiKey))
+	c.path = filepath.Join(dir, "clockifill", hex.EncodeToString(sum[:])[:16]+".json")
+
+	if raw, err := os.ReadFile(c.path); err == nil {
+		if err := json.Unmarshal(raw, &c.data); err != nil {
+			c.data = cacheData{}
+		}
+	}
+
+	return c
+}
+
+// reset discards everything cached so the next lookups hit the API.
+func (c *apiCache) reset() {
+	c.data = cacheData{}
+}
+
+// idsFresh reports whether the cached workspace ID can be used. The user ID
+// is cached alongside it once fetched and may still be empty.
+func (c *apiCache) idsFresh() bool {
+	return c.data.WorkspaceID != "" && time.Since(c.data.IDsFetched) < idCacheTTL
+}
+
+func (c *apiCache) projectsFresh(ttl time.Duration) bool {
+	return c.data.Projects != nil && time.Since(c.data.ProjectsFetched) < ttl
+}
+
+// entriesCacheKey identifies an index of existing entries by project and the
+// local date range it covers.
+func entriesCacheKey(projectID string, start, end time.Time) string {
+	return projectID + "|" + start.Format(dateLayout) + "|" + end.Format(dateLayout)
+}
+
+// entryDates returns the cached dates with an entry for key, if the index is
+// still fresh.
+func (c *apiCache) entryDates(key string) (map[string]bool, bool) {
+	index, ok := c.data.Entries[key]
+	if !ok || time.Since(index.Fetched) >= entriesCacheTTL {
+		return nil, false
+	}
+
+	dates := make(map[string]bool, len(index.Dates))
+	for _, date := range index.Dates {
+		dates[date] = true
+	}
+
+	return dates, true
+}
+
+// storeEntryDates replaces the index for key with freshly fetched dates and
+// drops any other indexes that have expired.
+func (c *apiCache) storeEntryDates(key string, dates map[string]bool) {
+	for k, index := range c.data.Entries {
+		if time.Since(index.Fetched) >= entriesCacheTTL {
+			delete(c.data.Entries, k)
+		}
+	}
+
+	if c.data.Entries == nil {
+		c.data.Entries = make(map[string]entriesIndex)
+	}
+
+	index := entriesIndex{Fetched: time.Now()}
+	for date := range dates {
+		index.Dates = append(index.Dates, date)
+	}
+	c.data.Entries[key] = index
+}
+
+// addEntryDates marks dates as having an entry without extending the
+// index's lifetime, so entries created by this run are not added again.
+func (c *apiCache) addEntryDates(key string, dates ...string) {
+	index, ok := c.data.Entries[key]
+	if !ok {
+		return
+	}
+
+	index.Dates = append(index.Dates, dates...)
+	c.data.Entries[key] = index
+}
+
+// dropEntryDates forgets the index for key so the next run fetches it again.
+func (c *apiCache) dropEntryDates(key string) {
+	delete(c.data.Entries, key)
+}
+
+// save writes the cache atomically. Errors are returned but callers may
+// ignore them since the cache is only an optimization.
+func (c *apiCache) save() error {
+	if c.path == "" {
+		return nil
+	}
+
+	if err := os.MkdirAll(filepath.Dir(c.path), 0o700); err != nil {
+		return err
+	}
+
+	raw, err := json.Marshal(c.data)
+	if err != nil {
+		return err
+	}
+
+	tmp := c.path + ".tmp"
+	if err := os.WriteFile(tmp, raw, 0o600); err != nil {
+		return err
+	}
+
+	return os.Rename(tmp, c.path)
+}
@@ -0,0 +1,131 @@
+package main
+
+import (
+	"testing"
+	"time"
+)
+
+func TestEntriesIndex(t *testing.T) {
+	const key = "project|2024-03-01|2024-03-15"
+	fresh := time.Now().Add(-time.Minute)
+	expired := time.Now().Add(-entriesCacheTTL - time.Minute)
+
+	tests := []struct {
+		name      string
+		setup     func(c *apiCache)
+		wantOK    bool
+		wantDates []string
+	}{
+		{
+			name:   "missing",
+			setup:  func(c *apiCache) {},
+			wantOK: false,
+		},
+		{
+			name: "stored",
+			setup: func(c *apiCache) {
+				c.storeEntryDates(key, map[string]bool{"2024-03-04": true})
+			},
+			wantOK:    true,
+			wantDates: []string{"2024-03-04"},
+		},
+		{
+			name: "expired",
+			setup: func(c *apiCache) {
+				c.data.Entries = map[string]entriesIndex{key: {Dates: []string{"2024-03-04"}, Fetched: expired}}
+			},
+			wantOK: false,
+		},
+		{
+			name: "added dates join a fresh index",
+			setup: func(c *apiCache) {
+				c.data.Entries = map[string]entriesIndex{key: {Dates: []string{"2024-03-04"}, Fetched: fresh}}
+				c.addEntryDates(key, "2024-03-05")
+			},
+			wantOK:    true,
+			wantDates: []string{"2024-03-04", "2024-03-05"},
+		},
+		{
+			name: "added dates do not revive an expired index",
+			setup: func(c *apiCache) {
+				c.data.Entries = map[string]entriesIndex{key: {Dates: []string{"2024-03-04"}, Fetched: expired}}
+				c.addEntryDates(key, "2024-03-05")
+			},
+			wantOK: false,
+		},
+		{
+			name: "added dates without an index are ignored",
+			setup: func(c *apiCache) {
+				c.addEntryDates(key, "2024-03-05")
+			},
+			wantOK: false,
+		},
+		{
+			name: "dropped",
+			setup: func(c *apiCache) {
+				c.storeEntryDates(key, map[string]bool{"2024-03-04": true})
+				c.dropEntryDates(key)
+			},
+			wantOK: false,
+		},
+	}
+
+	for _, tt := range tests {
+		t.Run(tt.name, func(t *testing.T) {
+			dir := t.TempDir()
+			c := loadCacheFrom(dir, "api-key")
+			tt.setup(c)
+
+			// Round-trip through disk so the stored form is what gets checked
+			if err := c.save(); err != nil {
+				t.Fatal(err)
+			}
+			c = loadCacheFrom(dir, "api-key")
+
+			dates, ok := c.entryDates(key)
+			if ok != tt.wantOK {
+				t.Fatalf("entryDates() ok = %v; want %v", ok, tt.wantOK)
+			}
+			if len(dates) != len(tt.wantDates) {
+				t.Fatalf("entryDates() = %v; want %v", dates, tt.wantDates)
+			}
+			for _, date := range tt.wantDates {
+				if !dates[date] {
+					t.Errorf("entryDates() = %v; missing %s", dates, date)
+				}
+			}
+		})
+	}
+}
+
+func TestAddEntryDatesKeepsFetchTime(t *testing.T) {
+	const key = "project|2024-03-01|2024-03-15"
+	fetched := time.Now().Add(-time.Minute).Round(0)
+
+	c := loadCacheFrom(t.TempDir(), "api-key")
+	c.data.Entries = map[string]entriesIndex{key: {Fetched: fetched}}
+	c.addEntryDates(key, "2024-03-05")
+
+	if got := c.data.Entries[key].Fetched; !got.Equal(fetched) {
+		t.Errorf("Fetched = %v after addEntryDates; want unchanged %v", got, fetched)
+	}
+}
+
+func TestStoreEntryDatesPrunesExpired(t *testing.T) {
+	c := loadCacheFrom(t.TempDir(), "api-key")
+	c.data.Entries = map[string]entriesIndex{
+		"old":   {Fetched: time.Now().Add(-entriesCacheTTL - time.Minute)},
+		"other": {Fetched: time.Now()},
+	}
+
+	c.storeEntryDates("new", map[string]bool{"2024-03-04": true})
+
+	if _, ok := c.data.Entries["old"]; ok {
+		t.Error("expired index was not pruned")
+	}
+	for _, key := range []string{"other", "new"} {
+		if _, ok := c.data.Entries[key]; !ok {
+			t.Errorf("index %q was dropped", key)
+		}
+	}
+}
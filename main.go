@@ -2,25 +2,69 @@ package main
 
 import (
 	"bytes"
+	"crypto/sha256"
+	"encoding/hex"
 	"encoding/json"
+	"flag"
 	"fmt"
 	"io"
+	"iter"
 	"net/http"
+	"net/url"
 	"os"
 	"strconv"
 	"strings"
+	"sync"
 	"time"
 
 	"github.com/joho/godotenv"
 )
 
-const baseURL = "https://api.clockify.me/api/v1"
+const (
+	baseURL = "https://api.clockify.me/api/v1"
+
+	// maxConcurrentRequests bounds how many API calls run in parallel
+	maxConcurrentRequests = 8
+
+	// timeEntriesPageSize is the page size used when listing time entries
+	timeEntriesPageSize = 200
+
+	// requestTimeout bounds a single HTTP attempt, including reading the body
+	requestTimeout = 30 * time.Second
+
+	// Standard working hours used for every entry, in local time
+	workdayStartHour   = 9
+	workdayStartMinute = 0
+	workdayEndHour     = 16
+	workdayEndMinute   = 30
+
+	dateLayout = "2006-01-02"
+)
 
 type ClockifyAPI struct {
 	apiKey      string
 	workspaceID string
 	userID      string
+	userMu      sync.Mutex
 	client      *http.Client
+
+	workspaceEndpoint   string
+	timeEntriesEndpoint string
+
+	cache       *apiCache
+	projectsTTL time.Duration
+	limiter     rateLimiter
+
+	submittedMu sync.Mutex
+	submitted   map[string]bool
+}
+
+// Options controls how cached lookups are used when creating the API client.
+type Options struct {
+	// Refresh ignores cached data and fetches everything from the API
+	Refresh bool
+	// ProjectsTTL is how long a cached project list is reused
+	ProjectsTTL time.Duration
 }
 
 type Workspace struct {
@@ -47,7 +91,17 @@ type TimeEntry struct {
 	Billable    string `json:"billable"`
 }
 
-func NewClockifyAPI() (*ClockifyAPI, error) {
+// TimeEntryRecord is an existing time entry as returned by the API.
+type TimeEntryRecord struct {
+	ID           string `json:"id"`
+	ProjectID    string `json:"projectId"`
+	TimeInterval struct {
+		Start string `json:"start"`
+		End   string `json:"end"`
+	} `json:"timeInterval"`
+}
+
+func NewClockifyAPI(opts Options) (*ClockifyAPI, error) {
 	if err := godotenv.Load(); err != nil {
 		return nil, fmt.Errorf("error loading .env file: %v", err)
 	}
@@ -57,53 +111,159 @@ func NewClockifyAPI() (*ClockifyAPI, error) {
 		return nil, fmt.Errorf("CLOCKIFY_API_KEY not found in environment variables")
 	}
 
+	// Start from the default transport so HTTP/2 and its dial, TLS and
+	// keep-alive timeouts are kept, and only widen the idle pool
+	transport := http.DefaultTransport.(*http.Transport).Clone()
+	transport.MaxIdleConnsPerHost = 16
+	transport.MaxConnsPerHost = 20
+
 	api := &ClockifyAPI{
-		apiKey: apiKey,
-		client: &http.Client{},
+		apiKey:      apiKey,
+		client:      &http.Client{Transport: transport, Timeout: requestTimeout},
+		cache:       loadCache(apiKey),
+		projectsTTL: opts.ProjectsTTL,
 	}
 
-	var err error
-	if api.workspaceID, err = api.getWorkspaceID(); err != nil {
-		return nil, err
+	if opts.Refresh {
+		api.cache.reset()
 	}
 
-	if api.userID, err = api.getUserID(); err != nil {
-		return nil, err
+	// The user ID is only needed for time entries, so it is looked up lazily
+	if api.cache.idsFresh() {
+		api.workspaceID = api.cache.data.WorkspaceID
+		api.userID = api.cache.data.UserID
+	} else {
+		var err error
+		if api.workspaceID, err = api.getWorkspaceID(); err != nil {
+			return nil, err
+		}
+
+		if api.cache.data.WorkspaceID != api.workspaceID {
+			api.cache.data.Projects = nil
+		}
+		api.cache.data.WorkspaceID = api.workspaceID
+		api.cache.data.UserID = ""
+		api.cache.data.IDsFetched = time.Now()
+		api.cache.save()
 	}
 
+	// Endpoints under the workspace never change for the rest of the run
+	api.workspaceEndpoint = "/workspaces/" + api.workspaceID
+	api.timeEntriesEndpoint = api.workspaceEndpoint + "/time-entries"
+
 	return api, nil
 }
 
-func (api *ClockifyAPI) makeRequest(method, endpoint string, body interface{}) (*http.Response, error) {
-	var bodyReader io.Reader
+// currentUserID returns the user's ID, fetching and caching it on first use.
+func (api *ClockifyAPI) currentUserID() (string, error) {
+	api.userMu.Lock()
+	defer api.userMu.Unlock()
+
+	if api.userID != "" {
+		return api.userID, nil
+	}
+
+	userID, err := api.getUserID()
+	if err != nil {
+		return "", err
+	}
+
+	api.userID = userID
+	api.cache.data.UserID = userID
+	api.cache.save()
+
+	return userID, nil
+}
+
+// Close releases the idle keep-alive connections held by the client.
+func (api *ClockifyAPI) Close() {
+	api.client.CloseIdleConnections()
+}
+
+// makeRequest sends a request, retrying transport errors, throttling and
+// transient server errors with backoff, waiting at most maxTotalRetryWait in
+// total. POSTs are only retried when the server did not process them (see
+// shouldRetry), and additionally wait out a nearly exhausted rate limit
+// before being sent.
+func (api *ClockifyAPI) makeRequest(method, endpoint string, body interface{}, header http.Header) (*http.Response, error) {
+	var jsonData []byte
 	if body != nil {
-		jsonData, err := json.Marshal(body)
-		if err != nil {
+		var err error
+		if jsonData, err = json.Marshal(body); err != nil {
 			return nil, err
 		}
-		bodyReader = bytes.NewBuffer(jsonData)
 	}
 
-	req, err := http.NewRequest(method, baseURL+endpoint, bodyReader)
-	if err != nil {
-		return nil, err
+	var waited time.Duration
+	for attempt := 0; ; attempt++ {
+		if method == http.MethodPost {
+			api.limiter.wait()
+		}
+
+		var bodyReader io.Reader
+		if jsonData != nil {
+			bodyReader = bytes.NewReader(jsonData)
+		}
+
+		req, err := http.NewRequest(method, baseURL+endpoint, bodyReader)
+		if err != nil {
+			return nil, err
+		}
+
+		for key, values := range header {
+			req.Header[key] = values
+		}
+		req.Header.Set("X-Api-Key", api.apiKey)
+		req.Header.Set("Content-Type", "application/json")
+
+		resp, err := api.client.Do(req)
+		if err == nil {
+			api.limiter.observe(resp.Header)
+		}
+
+		if attempt >= maxRetries || !shouldRetry(method, resp, err) {
+			return resp, err
+		}
+
+		// Give up once the waits for this request would exceed the budget
+		delay, ok := retryDelay(attempt, resp)
+		if !ok || waited+delay > maxTotalRetryWait {
+			return resp, err
+		}
+		waited += delay
+
+		if resp != nil {
+			if resp.Header.Get("Retry-After") != "" {
+				fmt.Printf("Rate limited by Clockify, waiting %s before retrying...\n", delay.Round(time.Second))
+			}
+			drainBody(resp)
+		}
+		time.Sleep(delay)
 	}
+}
 
-	req.Header.Set("X-Api-Key", api.apiKey)
-	req.Header.Set("Content-Type", "application/json")
+// decodeJSON streams the response body into v, then drains and closes it so
+// the connection goes back to the pool for reuse.
+func decodeJSON(resp *http.Response, v interface{}) error {
+	defer drainBody(resp)
+	return json.NewDecoder(resp.Body).Decode(v)
+}
 
-	return api.client.Do(req)
+// drainBody discards any unread body and closes it. The transport only
+// reuses a keep-alive connection once its body has been read to the end.
+func drainBody(resp *http.Response) {
+	io.Copy(io.Discard, resp.Body)
+	resp.Body.Close()
 }
 
 func (api *ClockifyAPI) getWorkspaceID() (string, error) {
-	resp, err := api.makeRequest("GET", "/workspaces", nil)
+	resp, err := api.makeRequest("GET", "/workspaces", nil, nil)
 	if err != nil {
 		return "", err
 	}
-	defer resp.Body.Close()
 
 	var workspaces []Workspace
-	if err := json.NewDecoder(resp.Body).Decode(&workspaces); err != nil {
+	if err := decodeJSON(resp, &workspaces); err != nil {
 		return "", err
 	}
 
@@ -115,16 +275,15 @@ func (api *ClockifyAPI) getWorkspaceID() (string, error) {
 }
 
 func (api *ClockifyAPI) getUserID() (string, error) {
-	resp, err := api.makeRequest("GET", "/user", nil)
+	resp, err := api.makeRequest("GET", "/user", nil, nil)
 	if err != nil {
 		return "", err
 	}
-	defer resp.Body.Close()
 
 	var user struct {
 		ID string `json:"id"`
 	}
-	if err := json.NewDecoder(resp.Body).Decode(&user); err != nil {
+	if err := decodeJSON(resp, &user); err != nil {
 		return "", err
 	}
 
@@ -132,111 +291,386 @@ func (api *ClockifyAPI) getUserID() (string, error) {
 }
 
 func (api *ClockifyAPI) getProjects() ([]Project, error) {
-	resp, err := api.makeRequest("GET", fmt.Sprintf("/workspaces/%s/projects", api.workspaceID), nil)
+	if api.cache.projectsFresh(api.projectsTTL) {
+		return api.cache.data.Projects, nil
+	}
+
+	resp, err := api.makeRequest("GET", api.workspaceEndpoint+"/projects", nil, nil)
 	if err != nil {
 		return nil, err
 	}
-	defer resp.Body.Close()
 
 	var projects []Project
-	if err := json.NewDecoder(resp.Body).Decode(&projects); err != nil {
+	if err := decodeJSON(resp, &projects); err != nil {
 		return nil, err
 	}
 
+	api.cache.data.Projects = projects
+	api.cache.data.ProjectsFetched = time.Now()
+	api.cache.save()
+
 	return projects, nil
 }
 
+// refreshProjects discards any cached project list and fetches it again.
+func (api *ClockifyAPI) refreshProjects() ([]Project, error) {
+	api.cache.data.Projects = nil
+	return api.getProjects()
+}
+
 func (api *ClockifyAPI) getTasks(projectID string) ([]Task, error) {
-	resp, err := api.makeRequest("GET", fmt.Sprintf("/workspaces/%s/projects/%s/tasks", api.workspaceID, projectID), nil)
+	resp, err := api.makeRequest("GET", api.workspaceEndpoint+"/projects/"+projectID+"/tasks", nil, nil)
 	if err != nil {
 		return nil, err
 	}
-	defer resp.Body.Close()
 
 	var tasks []Task
-	if err := json.NewDecoder(resp.Body).Decode(&tasks); err != nil {
+	if err := decodeJSON(resp, &tasks); err != nil {
 		return nil, err
 	}
 
 	return tasks, nil
 }
 
-func (api *ClockifyAPI) hasTimeEntry(projectID string, startTime, endTime time.Time) (bool, error) {
-	params := fmt.Sprintf("?start=%s&end=%s&project=%s",
-		startTime.UTC().Format(time.RFC3339),
-		endTime.UTC().Format(time.RFC3339),
-		projectID)
+// timeEntries yields the user's entries for a project between start and end,
+// fetching one page at a time. Entries arrive newest first, so iteration stops
+// at the first entry older than start, or after a short or empty page.
+func (api *ClockifyAPI) timeEntries(projectID string, start, end time.Time, pageSize int) iter.Seq2[TimeEntryRecord, error] {
+	return func(yield func(TimeEntryRecord, error) bool) {
+		// Only the page number changes between requests
+		params := url.Values{}
+		params.Set("start", start.UTC().Format(time.RFC3339))
+		params.Set("end", end.UTC().Format(time.RFC3339))
+		params.Set("project", projectID)
+		params.Set("page-size", strconv.Itoa(pageSize))
+
+		for page := 1; ; page++ {
+			params.Set("page", strconv.Itoa(page))
+			pageEntries, err := api.timeEntriesPage(params)
+			if err != nil {
+				yield(TimeEntryRecord{}, err)
+				return
+			}
+
+			for _, entry := range pageEntries {
+				if entryStart, err := time.Parse(time.RFC3339, entry.TimeInterval.Start); err == nil && entryStart.Before(start) {
+					return
+				}
+				if !yield(entry, nil) {
+					return
+				}
+			}
 
-	endpoint := fmt.Sprintf("/workspaces/%s/user/%s/time-entries%s",
-		api.workspaceID, api.userID, params)
+			if len(pageEntries) < pageSize {
+				return
+			}
+		}
+	}
+}
 
-	resp, err := api.makeRequest("GET", endpoint, nil)
+// timeEntriesPage fetches a single page of the user's entries matching params.
+func (api *ClockifyAPI) timeEntriesPage(params url.Values) ([]TimeEntryRecord, error) {
+	userID, err := api.currentUserID()
 	if err != nil {
-		return false, err
+		return nil, err
 	}
-	defer resp.Body.Close()
 
-	// Read the response body
-	body, err := io.ReadAll(resp.Body)
+	endpoint := api.workspaceEndpoint + "/user/" + userID + "/time-entries?" + params.Encode()
+
+	resp, err := api.makeRequest("GET", endpoint, nil, nil)
 	if err != nil {
-		return false, fmt.Errorf("error reading response body: %v", err)
+		return nil, err
 	}
 
-	// Handle empty response
-	if len(body) == 0 {
-		return false, nil
+	if resp.StatusCode != http.StatusOK {
+		body, _ := io.ReadAll(resp.Body)
+		resp.Body.Close()
+		return nil, fmt.Errorf("failed to list time entries: %s - body: %s", resp.Status, string(body))
 	}
 
-	// Try to decode the response
-	var entries []interface{}
-	if err := json.Unmarshal(body, &entries); err != nil {
-		return false, fmt.Errorf("error decoding response (status %d): %v - body: %s",
-			resp.StatusCode, err, string(body))
+	var entries []TimeEntryRecord
+	if err := decodeJSON(resp, &entries); err != nil {
+		// Handle empty response
+		if err == io.EOF {
+			return nil, nil
+		}
+		return nil, fmt.Errorf("error decoding response (status %d): %v", resp.StatusCode, err)
 	}
 
-	return len(entries) > 0, nil
+	return entries, nil
 }
 
-func (api *ClockifyAPI) addTimeEntry(projectID string, startTime, endTime time.Time, description string, taskID string, billable bool) error {
-	entry := TimeEntry{
-		Start:       startTime.UTC().Format(time.RFC3339),
-		End:         endTime.UTC().Format(time.RFC3339),
-		Description: description,
-		ProjectID:   projectID,
-		Billable:    strconv.FormatBool(billable),
+// newEntryTemplate returns a TimeEntry with the fields that stay the same for
+// every entry of a run already filled in.
+func newEntryTemplate(projectID, taskID string, billable bool) TimeEntry {
+	return TimeEntry{
+		ProjectID: projectID,
+		TaskID:    taskID,
+		Billable:  strconv.FormatBool(billable),
 	}
+}
 
-	if taskID != "" {
-		entry.TaskID = taskID
-	}
+// forDay returns a copy of the template for one day's time slot.
+func (entry TimeEntry) forDay(day dayWindow, description string) TimeEntry {
+	entry.Start = day.Start
+	entry.End = day.End
+	entry.Description = description
+	return entry
+}
 
-	resp, err := api.makeRequest("POST", fmt.Sprintf("/workspaces/%s/time-entries", api.workspaceID), entry)
+// postTimeEntry creates the entry. Start and End must already be formatted as
+// UTC RFC 3339 timestamps.
+func (api *ClockifyAPI) postTimeEntry(entry TimeEntry) error {
+	userID, err := api.currentUserID()
 	if err != nil {
 		return err
 	}
-	defer resp.Body.Close()
+
+	// The same entry always maps to the same key. Clockify currently ignores
+	// Idempotency-Key, so the header is best effort only; the in-process set
+	// is what keeps this run from sending an entry twice
+	sum := sha256.Sum256([]byte(userID + "|" + entry.ProjectID + "|" + entry.Start + "|" + entry.End))
+	key := hex.EncodeToString(sum[:])
+
+	if !api.markSubmitted(key) {
+		return fmt.Errorf("time entry for %s was already submitted", entry.Start)
+	}
+
+	header := http.Header{}
+	header.Set("Idempotency-Key", key)
+
+	// The key stays marked whenever the entry may have been saved: after a
+	// transport error or timeout, or a server error
+	resp, err := api.makeRequest("POST", api.timeEntriesEndpoint, entry, header)
+	if err != nil {
+		return fmt.Errorf("time entry may have been created, check Clockify: %v", err)
+	}
+	defer drainBody(resp)
+
+	if resp.StatusCode >= http.StatusInternalServerError {
+		return fmt.Errorf("time entry may have been created, check Clockify: %s", resp.Status)
+	}
 
 	if resp.StatusCode != http.StatusCreated {
+		api.unmarkSubmitted(key)
 		return fmt.Errorf("failed to create time entry: %s", resp.Status)
 	}
 
 	return nil
 }
 
+// markSubmitted records an idempotency key for this run, reporting false if
+// it was already recorded.
+func (api *ClockifyAPI) markSubmitted(key string) bool {
+	api.submittedMu.Lock()
+	defer api.submittedMu.Unlock()
+
+	if api.submitted[key] {
+		return false
+	}
+	if api.submitted == nil {
+		api.submitted = make(map[string]bool)
+	}
+	api.submitted[key] = true
+
+	return true
+}
+
+// unmarkSubmitted forgets a key whose POST was definitely rejected so it may
+// be sent again.
+func (api *ClockifyAPI) unmarkSubmitted(key string) {
+	api.submittedMu.Lock()
+	defer api.submittedMu.Unlock()
+
+	delete(api.submitted, key)
+}
+
+// rollToWorkday is the number of days from each weekday to the same or next
+// working day, indexed by time.Weekday.
+var rollToWorkday = [7]int{1, 0, 0, 0, 0, 0, 2}
+
+// daysToNextWorkday is the number of days from each weekday to the following
+// working day, indexed by time.Weekday.
+var daysToNextWorkday = [7]int{1, 1, 1, 1, 1, 3, 2}
+
 func getWorkingDays(startDate, endDate time.Time) []time.Time {
-	var workingDays []time.Time
-	currentDate := startDate
+	if endDate.Before(startDate) {
+		return nil
+	}
 
-	for currentDate.Before(endDate) || currentDate.Equal(endDate) {
-		if currentDate.Weekday() != time.Saturday && currentDate.Weekday() != time.Sunday {
-			workingDays = append(workingDays, currentDate)
-		}
-		currentDate = currentDate.AddDate(0, 0, 1)
+	// Size for the whole range up front; five of every seven days are working days
+	totalDays := int(endDate.Sub(startDate).Hours()/24) + 1
+	workingDays := make([]time.Time, 0, totalDays*5/7+2)
+
+	// Step directly between working days instead of testing every date
+	currentDate := startDate.AddDate(0, 0, rollToWorkday[startDate.Weekday()])
+	for !currentDate.After(endDate) {
+		workingDays = append(workingDays, currentDate)
+		currentDate = currentDate.AddDate(0, 0, daysToNextWorkday[currentDate.Weekday()])
 	}
 
 	return workingDays
 }
 
+// forEachConcurrently calls fn for every index in [0, n), running at most
+// maxConcurrentRequests calls at a time, and waits for all of them to finish.
+func forEachConcurrently(n int, fn func(i int)) {
+	var wg sync.WaitGroup
+	sem := make(chan struct{}, maxConcurrentRequests)
+
+	for i := 0; i < n; i++ {
+		wg.Add(1)
+		sem <- struct{}{}
+		go func() {
+			defer wg.Done()
+			defer func() { <-sem }()
+			fn(i)
+		}()
+	}
+
+	wg.Wait()
+}
+
+// dayWindow is a working day's time slot with its timestamps formatted once.
+type dayWindow struct {
+	Date  string // local date in dateLayout
+	Start string // UTC RFC 3339
+	End   string // UTC RFC 3339
+}
+
+func newDayWindows(days []time.Time) []dayWindow {
+	windows := make([]dayWindow, len(days))
+	for i, day := range days {
+		year, month, date := day.Date()
+		loc := day.Location()
+		windows[i] = dayWindow{
+			Date:  day.Format(dateLayout),
+			Start: time.Date(year, month, date, workdayStartHour, workdayStartMinute, 0, 0, loc).UTC().Format(time.RFC3339),
+			End:   time.Date(year, month, date, workdayEndHour, workdayEndMinute, 0, 0, loc).UTC().Format(time.RFC3339),
+		}
+	}
+
+	return windows
+}
+
+// existingEntryDates returns the local dates that already have an entry for
+// the project.
+func existingEntryDates(entries iter.Seq2[TimeEntryRecord, error], projectID string, loc *time.Location) (map[string]bool, error) {
+	existing := make(map[string]bool)
+	for entry, err := range entries {
+		if err != nil {
+			return nil, err
+		}
+		if entry.ProjectID != projectID {
+			continue
+		}
+		entryStart, err := time.Parse(time.RFC3339, entry.TimeInterval.Start)
+		if err != nil {
+			continue
+		}
+		existing[entryStart.In(loc).Format(dateLayout)] = true
+	}
+
+	return existing, nil
+}
+
+// hasMissingDay reports whether any of days lacks an existing entry.
+func hasMissingDay(days []dayWindow, existing map[string]bool) bool {
+	for _, day := range days {
+		if !existing[day.Date] {
+			return true
+		}
+	}
+
+	return false
+}
+
+// missingDays returns the days without an existing entry, reporting each
+// day that is skipped.
+func missingDays(days []dayWindow, existing map[string]bool) []dayWindow {
+	missing := make([]dayWindow, 0, len(days))
+	for _, day := range days {
+		if existing[day.Date] {
+			fmt.Printf("Skipping %s - Time entry already exists\n", day.Date)
+			continue
+		}
+		missing = append(missing, day)
+	}
+
+	return missing
+}
+
+// taskPrefetch fetches the tasks of many projects in the background so the
+// selected project's tasks are ready once the user has chosen.
+type taskPrefetch struct {
+	api      *ClockifyAPI
+	projects map[string]*prefetchedTasks
+	stop     chan struct{}
+	stopOnce sync.Once
+}
+
+type prefetchedTasks struct {
+	once  sync.Once
+	tasks []Task
+	err   error
+}
+
+// fetch loads the project's tasks once. Concurrent callers block until the
+// first call has finished and then share its result.
+func (p *taskPrefetch) fetch(projectID string) *prefetchedTasks {
+	entry := p.projects[projectID]
+	entry.once.Do(func() {
+		entry.tasks, entry.err = p.api.getTasks(projectID)
+	})
+
+	return entry
+}
+
+// prefetchTasks starts fetching the tasks of every project using at most
+// maxConcurrentRequests workers.
+func (api *ClockifyAPI) prefetchTasks(projects []Project) *taskPrefetch {
+	p := &taskPrefetch{
+		api:      api,
+		projects: make(map[string]*prefetchedTasks, len(projects)),
+		stop:     make(chan struct{}),
+	}
+
+	jobs := make(chan string, len(projects))
+	for _, project := range projects {
+		p.projects[project.ID] = &prefetchedTasks{}
+		jobs <- project.ID
+	}
+	close(jobs)
+
+	for i := 0; i < min(maxConcurrentRequests, len(projects)); i++ {
+		go func() {
+			for projectID := range jobs {
+				select {
+				case <-p.stop:
+					return
+				default:
+					p.fetch(projectID)
+				}
+			}
+		}()
+	}
+
+	return p
+}
+
+// tasks returns the tasks of the selected project, waiting for or starting
+// its fetch as needed, and stops fetches that have not started yet.
+func (p *taskPrefetch) tasks(projectID string) ([]Task, error) {
+	p.stopOnce.Do(func() { close(p.stop) })
+
+	if _, ok := p.projects[projectID]; !ok {
+		return p.api.getTasks(projectID)
+	}
+
+	entry := p.fetch(projectID)
+	return entry.tasks, entry.err
+}
+
 func getDescriptionMode() int {
 	fmt.Println("\nHow would you like to handle task descriptions?")
 	fmt.Println("1. Use default description ('Standard workday') for all entries")
@@ -254,6 +688,52 @@ func getDescriptionMode() int {
 	}
 }
 
+// parseDescriptionMode maps a -mode value to the choices offered by
+// getDescriptionMode.
+func parseDescriptionMode(value string) (int, bool) {
+	switch strings.ToLower(value) {
+	case "default":
+		return 1, true
+	case "custom":
+		return 2, true
+	case "per-day":
+		return 3, true
+	}
+
+	return 0, false
+}
+
+// resolveChoice matches value against an exact ID, then a case-insensitive
+// name, then a 1-based list number, and returns the matching index, or -1 if
+// none does. IDs and names come first so scripted runs do not depend on the
+// order of the list.
+func resolveChoice(value string, n int, item func(i int) (id, name string)) int {
+	for i := 0; i < n; i++ {
+		if id, _ := item(i); value == id {
+			return i
+		}
+	}
+
+	for i := 0; i < n; i++ {
+		if _, name := item(i); strings.EqualFold(value, name) {
+			return i
+		}
+	}
+
+	if num, err := strconv.Atoi(value); err == nil && num >= 1 && num <= n {
+		return num - 1
+	}
+
+	return -1
+}
+
+// findProject resolves a -project value with resolveChoice.
+func findProject(projects []Project, value string) int {
+	return resolveChoice(value, len(projects), func(i int) (string, string) {
+		return projects[i].ID, projects[i].Name
+	})
+}
+
 func getBillablePreference() bool {
 	fmt.Print("\nMake entries billable? (y/N): ")
 	var input string
@@ -263,11 +743,39 @@ func getBillablePreference() bool {
 }
 
 func main() {
-	api, err := NewClockifyAPI()
+	refresh := flag.Bool("refresh", false, "ignore cached workspace, user and project data")
+	projectsTTL := flag.Duration("projects-ttl", defaultProjectsCacheTTL, "how long to reuse the cached project list")
+	projectFlag := flag.String("project", "", "project to fill, by ID, name or list number")
+	taskFlag := flag.String("task", "", "task to use, by ID, name or list number; empty for no task")
+	modeFlag := flag.String("mode", "", "description mode: default, custom or per-day")
+	descriptionFlag := flag.String("description", "", "description for all entries (implies -mode=custom)")
+	billableFlag := flag.Bool("billable", false, "make entries billable")
+	dryRun := flag.Bool("dry-run", false, "show which entries would be added without creating them")
+	flag.Parse()
+
+	// Any option given on the command line replaces its prompt
+	setFlags := make(map[string]bool)
+	flag.Visit(func(f *flag.Flag) { setFlags[f.Name] = true })
+
+	descriptionMode := 0
+	if setFlags["mode"] {
+		var ok bool
+		if descriptionMode, ok = parseDescriptionMode(*modeFlag); !ok {
+			fmt.Printf("Invalid -mode %q, expected default, custom or per-day\n", *modeFlag)
+			return
+		}
+		if descriptionMode == 1 && setFlags["description"] {
+			fmt.Println("-description cannot be used with -mode=default")
+			return
+		}
+	}
+
+	api, err := NewClockifyAPI(Options{Refresh: *refresh, ProjectsTTL: *projectsTTL})
 	if err != nil {
 		fmt.Printf("Error initializing Clockify API: %v\n", err)
 		return
 	}
+	defer api.Close()
 
 	// Get projects
 	projects, err := api.getProjects()
@@ -276,34 +784,70 @@ func main() {
 		return
 	}
 
-	fmt.Println("\nAvailable Projects:")
-	for i, project := range projects {
-		fmt.Printf("%d. %s\n", i+1, project.Name)
-	}
+	var selectedProject Project
+	var tasks []Task
+	if setFlags["project"] {
+		projectIdx := findProject(projects, *projectFlag)
+		if projectIdx < 0 {
+			// The list may be cached, so look again before failing in case the
+			// project was created or renamed since
+			if projects, err = api.refreshProjects(); err != nil {
+				fmt.Printf("Error getting projects: %v\n", err)
+				return
+			}
+			projectIdx = findProject(projects, *projectFlag)
+		}
+		if projectIdx < 0 {
+			fmt.Printf("Project %q not found\n", *projectFlag)
+			return
+		}
 
-	// Select project
-	var projectIdx int
-	for {
-		fmt.Print("\nSelect project number: ")
-		fmt.Scanln(&projectIdx)
-		projectIdx--
-		if projectIdx >= 0 && projectIdx < len(projects) {
-			break
+		selectedProject = projects[projectIdx]
+		tasks, err = api.getTasks(selectedProject.ID)
+	} else {
+		// Fetch every project's tasks in the background while the user chooses
+		prefetch := api.prefetchTasks(projects)
+
+		fmt.Println("\nAvailable Projects:")
+		for i, project := range projects {
+			fmt.Printf("%d. %s\n", i+1, project.Name)
+		}
+
+		// Select project
+		var projectIdx int
+		for {
+			fmt.Print("\nSelect project number: ")
+			fmt.Scanln(&projectIdx)
+			projectIdx--
+			if projectIdx >= 0 && projectIdx < len(projects) {
+				break
+			}
+			fmt.Printf("Please enter a number between 1 and %d\n", len(projects))
 		}
-		fmt.Printf("Please enter a number between 1 and %d\n", len(projects))
-	}
 
-	selectedProject := projects[projectIdx]
+		selectedProject = projects[projectIdx]
 
-	// Get tasks
-	tasks, err := api.getTasks(selectedProject.ID)
+		// Get tasks, usually already fetched by the prefetch
+		tasks, err = prefetch.tasks(selectedProject.ID)
+	}
 	if err != nil {
 		fmt.Printf("Error getting tasks: %v\n", err)
 		return
 	}
 
 	var selectedTask *Task
-	if len(tasks) > 0 {
+	if setFlags["task"] {
+		if *taskFlag != "" {
+			taskIdx := resolveChoice(*taskFlag, len(tasks), func(i int) (string, string) {
+				return tasks[i].ID, tasks[i].Name
+			})
+			if taskIdx < 0 {
+				fmt.Printf("Task %q not found in project %s\n", *taskFlag, selectedProject.Name)
+				return
+			}
+			selectedTask = &tasks[taskIdx]
+		}
+	} else if len(tasks) > 0 {
 		fmt.Println("\nAvailable Tasks:")
 		for i, task := range tasks {
 			fmt.Printf("%d. %s\n", i+1, task.Name)
@@ -325,61 +869,107 @@ func main() {
 		fmt.Println("\nNo tasks found for this project, proceeding without task selection")
 	}
 
-	descriptionMode := getDescriptionMode()
-	billable := getBillablePreference()
+	if descriptionMode == 0 {
+		if setFlags["description"] {
+			descriptionMode = 2
+		} else {
+			descriptionMode = getDescriptionMode()
+		}
+	}
+
+	billable := *billableFlag
+	if !setFlags["billable"] {
+		billable = getBillablePreference()
+	}
 
 	defaultDescription := "Standard workday"
-	if descriptionMode == 2 {
+	if setFlags["description"] {
+		defaultDescription = *descriptionFlag
+	} else if descriptionMode == 2 {
 		fmt.Print("\nEnter the description to use for all entries: ")
 		fmt.Scanln(&defaultDescription)
 	}
 
 	// Calculate date range
 	now := time.Now()
-	startOfMonth := time.Date(now.Year(), now.Month(), 1, 9, 0, 0, 0, now.Location())
-	workingDays := getWorkingDays(startOfMonth, now)
-
-	skippedCount := 0
-	addedCount := 0
-
-	for _, day := range workingDays {
-		startTime := time.Date(day.Year(), day.Month(), day.Day(), 9, 0, 0, 0, day.Location())
-		endTime := time.Date(day.Year(), day.Month(), day.Day(), 16, 30, 0, 0, day.Location())
-
-		hasEntry, err := api.hasTimeEntry(selectedProject.ID, startTime, endTime)
-		if err != nil {
-			fmt.Printf("Error checking time entry for %s: %v\n", day.Format("2006-01-02"), err)
-			continue
+	startOfMonth := time.Date(now.Year(), now.Month(), 1, workdayStartHour, workdayStartMinute, 0, 0, now.Location())
+	workingDays := newDayWindows(getWorkingDays(startOfMonth, now))
+
+	taskID := ""
+	if selectedTask != nil {
+		taskID = selectedTask.ID
+	}
+	template := newEntryTemplate(selectedProject.ID, taskID, billable)
+
+	// Fetch the month's entries once instead of probing each day
+	rangeStart := time.Date(now.Year(), now.Month(), 1, 0, 0, 0, 0, now.Location())
+	rangeEnd := time.Date(now.Year(), now.Month(), now.Day(), 23, 59, 59, 0, now.Location())
+	entriesKey := entriesCacheKey(selectedProject.ID, rangeStart, rangeEnd)
+	// The cached index can only skip the run when every day is covered; if
+	// anything would be created, the entries are checked against Clockify
+	// again so entries added elsewhere since then are never duplicated
+	existing, ok := api.cache.entryDates(entriesKey)
+	if !ok || hasMissingDay(workingDays, existing) {
+		entries := api.timeEntries(selectedProject.ID, rangeStart, rangeEnd, timeEntriesPageSize)
+		if existing, err = existingEntryDates(entries, selectedProject.ID, now.Location()); err != nil {
+			fmt.Printf("Error getting existing time entries: %v\n", err)
+			return
 		}
+		api.cache.storeEntryDates(entriesKey, existing)
+		api.cache.save()
+	}
 
-		if hasEntry {
-			fmt.Printf("Skipping %s - Time entry already exists\n", day.Format("2006-01-02"))
-			skippedCount++
-			continue
+	// Compare against the existing entries locally, then insert only what is missing
+	toAdd := missingDays(workingDays, existing)
+	skippedCount := len(workingDays) - len(toAdd)
+
+	if *dryRun {
+		for _, day := range toAdd {
+			fmt.Printf("Would add time entry for %s\n", day.Date)
 		}
+		fmt.Printf("\nSummary: Would add %d entries, Skipped %d existing entries\n", len(toAdd), skippedCount)
+		return
+	}
 
-		description := defaultDescription
+	// Collect descriptions up front so the requests below never wait on input
+	descriptions := make([]string, len(toAdd))
+	for i, day := range toAdd {
+		descriptions[i] = defaultDescription
 		if descriptionMode == 3 {
-			fmt.Printf("\nEnter description for %s: ", day.Format("2006-01-02"))
-			fmt.Scanln(&description)
+			fmt.Printf("\nEnter description for %s: ", day.Date)
+			fmt.Scanln(&descriptions[i])
 		}
+	}
 
-		taskID := ""
-		if selectedTask != nil {
-			taskID = selectedTask.ID
-		}
+	addErrs := make([]error, len(toAdd))
+	forEachConcurrently(len(toAdd), func(i int) {
+		addErrs[i] = api.postTimeEntry(template.forDay(toAdd[i], descriptions[i]))
+	})
 
-		if err := api.addTimeEntry(selectedProject.ID, startTime, endTime, description, taskID, billable); err != nil {
+	var added []string
+	for i, day := range toAdd {
+		if err := addErrs[i]; err != nil {
 			if strings.Contains(err.Error(), "EOF") {
-				fmt.Printf("Skipping %s - Unable to verify existing entries\n", day.Format("2006-01-02"))
+				fmt.Printf("Unable to confirm time entry for %s - check Clockify before running again\n", day.Date)
 			} else {
-				fmt.Printf("Failed to add time entry for %s: %v\n", day.Format("2006-01-02"), err)
+				fmt.Printf("Failed to add time entry for %s: %v\n", day.Date, err)
 			}
 			continue
 		}
 
-		fmt.Printf("Added time entry for %s\n", day.Format("2006-01-02"))
-		addedCount++
+		fmt.Printf("Added time entry for %s\n", day.Date)
+		added = append(added, day.Date)
+	}
+	addedCount := len(added)
+
+	// A failed POST may still have created its entry, so the index can no
+	// longer be trusted and the next run must check Clockify again
+	if addedCount < len(toAdd) {
+		api.cache.dropEntryDates(entriesKey)
+		api.cache.save()
+	} else if addedCount > 0 {
+		api.cache.addEntryDates(entriesKey, added...)
+		api.cache.save()
 	}
 
 	fmt.Printf("\nSummary: Added %d entries, Skipped %d existing entries\n", addedCount, skippedCount)
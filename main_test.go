@@ -0,0 +1,79 @@
+package main
+
+import (
+	"testing"
+	"time"
+	_ "time/tzdata"
+)
+
+// workingDaysByLoop is the original day-by-day implementation, kept as the
+// reference for getWorkingDays.
+func workingDaysByLoop(startDate, endDate time.Time) []time.Time {
+	var workingDays []time.Time
+	for currentDate := startDate; !currentDate.After(endDate); currentDate = currentDate.AddDate(0, 0, 1) {
+		if currentDate.Weekday() != time.Saturday && currentDate.Weekday() != time.Sunday {
+			workingDays = append(workingDays, currentDate)
+		}
+	}
+
+	return workingDays
+}
+
+func TestGetWorkingDaysMatchesLoop(t *testing.T) {
+	// Monday 2024-03-04 in a zone with DST, covering every starting weekday
+	// and the US change on 2024-03-10
+	loc, err := time.LoadLocation("America/New_York")
+	if err != nil {
+		t.Fatal(err)
+	}
+	base := time.Date(2024, time.March, 4, 9, 0, 0, 0, loc)
+
+	for offset := 0; offset < 7; offset++ {
+		start := base.AddDate(0, 0, offset)
+		for length := -2; length <= 40; length++ {
+			end := start.Add(time.Duration(length) * 24 * time.Hour)
+
+			got := getWorkingDays(start, end)
+			want := workingDaysByLoop(start, end)
+			if len(got) != len(want) {
+				t.Fatalf("getWorkingDays(%s, %s) returned %d days; want %d",
+					start.Format(dateLayout), end.Format(dateLayout), len(got), len(want))
+			}
+			for i := range want {
+				if !got[i].Equal(want[i]) {
+					t.Fatalf("getWorkingDays(%s, %s)[%d] = %s; want %s",
+						start.Format(dateLayout), end.Format(dateLayout), i, got[i], want[i])
+				}
+			}
+		}
+	}
+}
+
+func TestFindProject(t *testing.T) {
+	projects := []Project{
+		{ID: "p-alpha", Name: "Alpha"},
+		{ID: "p-two", Name: "2"},
+		{ID: "p-beta", Name: "Beta"},
+	}
+
+	tests := []struct {
+		name  string
+		value string
+		want  int
+	}{
+		{"exact ID", "p-beta", 2},
+		{"name in different case", "aLPHA", 0},
+		{"numeric name beats list position", "2", 1},
+		{"list number", "3", 2},
+		{"no match", "Gamma", -1},
+		{"list number out of range", "4", -1},
+	}
+
+	for _, tt := range tests {
+		t.Run(tt.name, func(t *testing.T) {
+			if got := findProject(projects, tt.value); got != tt.want {
+				t.Errorf("findProject(%q) = %d; want %d", tt.value, got, tt.want)
+			}
+		})
+	}
+}
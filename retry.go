@@ -0,0 +1,161 @@
+package main
+
+import (
+	"math/rand/v2"
+	"net/http"
+	"strconv"
+	"sync"
+	"time"
+)
+
+const (
+	// maxRetries is how many times a failed request is retried
+	maxRetries = 8
+
+	// retryBaseDelay is the first backoff delay, doubled on each attempt
+	retryBaseDelay = 500 * time.Millisecond
+
+	// maxRetryDelay caps the exponential backoff between attempts
+	maxRetryDelay = 30 * time.Second
+
+	// maxRetryAfter is the longest server-requested wait that is sat out;
+	// a longer Retry-After ends the retries instead
+	maxRetryAfter = 5 * time.Minute
+
+	// maxTotalRetryWait bounds the time a single request spends waiting
+	// between attempts, so throttling cannot stall a run indefinitely
+	maxTotalRetryWait = 10 * time.Minute
+
+	// maxJitter is the upper bound of the random delay added to every wait
+	maxJitter = 250 * time.Millisecond
+
+	// rateLimitFloor is the remaining-request count below which POSTs wait
+	// for the rate limit window to reset
+	rateLimitFloor = 2
+)
+
+// shouldRetry reports whether a request failed in a way worth retrying:
+// a transport error, throttling or a transient server error.
+//
+// POSTs are not idempotent, so they are only retried when the server
+// definitely did not process them: a 429, or a 503 that names a Retry-After.
+// Any other failure may have happened after the entry was saved.
+func shouldRetry(method string, resp *http.Response, err error) bool {
+	if method == http.MethodPost {
+		if err != nil {
+			return false
+		}
+		switch resp.StatusCode {
+		case http.StatusTooManyRequests:
+			return true
+		case http.StatusServiceUnavailable:
+			return resp.Header.Get("Retry-After") != ""
+		}
+		return false
+	}
+
+	if err != nil {
+		return true
+	}
+
+	switch resp.StatusCode {
+	case http.StatusTooManyRequests,
+		http.StatusInternalServerError,
+		http.StatusBadGateway,
+		http.StatusServiceUnavailable,
+		http.StatusGatewayTimeout:
+		return true
+	}
+
+	return false
+}
+
+// retryDelay returns how long to wait before the next attempt. A Retry-After
+// header from the server is waited out in full; if it asks for longer than
+// maxRetryAfter, retryDelay reports false and the request should not be
+// retried. Otherwise it backs off exponentially with jitter.
+func retryDelay(attempt int, resp *http.Response) (time.Duration, bool) {
+	if resp != nil {
+		if delay, ok := parseRetryAfter(resp.Header.Get("Retry-After")); ok {
+			if delay > maxRetryAfter {
+				return 0, false
+			}
+			return delay + rand.N(maxJitter), true
+		}
+	}
+
+	delay := maxRetryDelay
+	if attempt < 16 {
+		delay = min(retryBaseDelay<<attempt, maxRetryDelay)
+	}
+
+	return delay + rand.N(maxJitter), true
+}
+
+// parseRetryAfter accepts both forms of Retry-After: delay seconds or an
+// HTTP date.
+func parseRetryAfter(value string) (time.Duration, bool) {
+	if value == "" {
+		return 0, false
+	}
+
+	if seconds, err := strconv.Atoi(value); err == nil {
+		return max(time.Duration(seconds)*time.Second, 0), true
+	}
+
+	if at, err := http.ParseTime(value); err == nil {
+		return max(time.Until(at), 0), true
+	}
+
+	return 0, false
+}
+
+// rateLimiter tracks the X-RateLimit-* headers of recent responses so POSTs
+// can pause before the server starts rejecting them. The zero value is ready
+// to use and safe for concurrent use.
+type rateLimiter struct {
+	mu        sync.Mutex
+	known     bool
+	remaining int
+	reset     time.Time
+}
+
+// observe records the rate limit state reported by a response.
+func (l *rateLimiter) observe(header http.Header) {
+	remaining, err := strconv.Atoi(header.Get("X-RateLimit-Remaining"))
+	if err != nil {
+		return
+	}
+
+	reset, err := strconv.ParseInt(header.Get("X-RateLimit-Reset"), 10, 64)
+	if err != nil {
+		return
+	}
+
+	l.mu.Lock()
+	defer l.mu.Unlock()
+
+	l.known = true
+	l.remaining = remaining
+	// Small values are seconds until the reset, large ones a Unix timestamp
+	if reset < 1e9 {
+		l.reset = time.Now().Add(time.Duration(reset) * time.Second)
+	} else {
+		l.reset = time.Unix(reset, 0)
+	}
+}
+
+// wait sleeps until the current rate limit window resets if the last known
+// remaining budget is nearly exhausted.
+func (l *rateLimiter) wait() {
+	l.mu.Lock()
+	var delay time.Duration
+	if l.known && l.remaining < rateLimitFloor {
+		delay = time.Until(l.reset)
+	}
+	l.mu.Unlock()
+
+	if delay > 0 {
+		time.Sleep(min(delay, maxRetryDelay) + rand.N(maxJitter))
+	}
+}
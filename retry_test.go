@@ -0,0 +1,139 @@
+package main
+
+import (
+	"net/http"
+	"strconv"
+	"testing"
+	"time"
+)
+
+func TestParseRetryAfter(t *testing.T) {
+	tests := []struct {
+		name   string
+		value  string
+		want   time.Duration
+		wantOK bool
+	}{
+		{"empty", "", 0, false},
+		{"seconds", "7", 7 * time.Second, true},
+		{"negative seconds", "-3", 0, true},
+		{"past date", "Mon, 02 Jan 2006 15:04:05 GMT", 0, true},
+		{"garbage", "soon", 0, false},
+	}
+
+	for _, tt := range tests {
+		t.Run(tt.name, func(t *testing.T) {
+			got, ok := parseRetryAfter(tt.value)
+			if got != tt.want || ok != tt.wantOK {
+				t.Errorf("parseRetryAfter(%q) = %v, %v; want %v, %v", tt.value, got, ok, tt.want, tt.wantOK)
+			}
+		})
+	}
+
+	// A future date is converted to the time remaining until it
+	future := time.Now().Add(time.Minute).UTC().Format(http.TimeFormat)
+	got, ok := parseRetryAfter(future)
+	if !ok || got <= 0 || got > time.Minute {
+		t.Errorf("parseRetryAfter(%q) = %v, %v; want about 1m, true", future, got, ok)
+	}
+}
+
+func TestRetryDelay(t *testing.T) {
+	withRetryAfter := func(value string) *http.Response {
+		return &http.Response{Header: http.Header{"Retry-After": []string{value}}}
+	}
+
+	tests := []struct {
+		name    string
+		attempt int
+		resp    *http.Response
+		min     time.Duration
+		wantOK  bool
+	}{
+		{"first backoff", 0, nil, retryBaseDelay, true},
+		{"doubled backoff", 2, nil, 4 * retryBaseDelay, true},
+		{"backoff capped", 10, nil, maxRetryDelay, true},
+		{"huge attempt capped", 100, nil, maxRetryDelay, true},
+		{"retry-after honored beyond backoff cap", 0, withRetryAfter("90"), 90 * time.Second, true},
+		{"retry-after too long", 0, withRetryAfter(strconv.Itoa(int(2 * maxRetryAfter / time.Second))), 0, false},
+	}
+
+	for _, tt := range tests {
+		t.Run(tt.name, func(t *testing.T) {
+			got, ok := retryDelay(tt.attempt, tt.resp)
+			if ok != tt.wantOK {
+				t.Fatalf("retryDelay() ok = %v; want %v", ok, tt.wantOK)
+			}
+			if ok && (got < tt.min || got >= tt.min+maxJitter) {
+				t.Errorf("retryDelay() = %v; want in [%v, %v)", got, tt.min, tt.min+maxJitter)
+			}
+		})
+	}
+}
+
+func TestShouldRetry(t *testing.T) {
+	status := func(code int, header http.Header) *http.Response {
+		return &http.Response{StatusCode: code, Header: header}
+	}
+	retryAfter := http.Header{"Retry-After": []string{"1"}}
+
+	tests := []struct {
+		name   string
+		method string
+		resp   *http.Response
+		err    error
+		want   bool
+	}{
+		{"get transport error", http.MethodGet, nil, http.ErrHandlerTimeout, true},
+		{"get 500", http.MethodGet, status(500, nil), nil, true},
+		{"get 404", http.MethodGet, status(404, nil), nil, false},
+		{"post transport error", http.MethodPost, nil, http.ErrHandlerTimeout, false},
+		{"post 429", http.MethodPost, status(429, nil), nil, true},
+		{"post 500", http.MethodPost, status(500, nil), nil, false},
+		{"post 504", http.MethodPost, status(504, nil), nil, false},
+		{"post 503 without retry-after", http.MethodPost, status(503, nil), nil, false},
+		{"post 503 with retry-after", http.MethodPost, status(503, retryAfter), nil, true},
+	}
+
+	for _, tt := range tests {
+		t.Run(tt.name, func(t *testing.T) {
+			if got := shouldRetry(tt.method, tt.resp, tt.err); got != tt.want {
+				t.Errorf("shouldRetry() = %v; want %v", got, tt.want)
+			}
+		})
+	}
+}
+
+func TestRateLimiterObserve(t *testing.T) {
+	now := time.Now()
+
+	tests := []struct {
+		name      string
+		remaining string
+		reset     string
+		wantKnown bool
+		wantReset time.Time
+	}{
+		{"seconds until reset", "1", "30", true, now.Add(30 * time.Second)},
+		{"unix timestamp", "1", strconv.FormatInt(now.Add(time.Minute).Unix(), 10), true, now.Add(time.Minute)},
+		{"missing headers", "", "", false, time.Time{}},
+		{"bad remaining", "lots", "30", false, time.Time{}},
+	}
+
+	for _, tt := range tests {
+		t.Run(tt.name, func(t *testing.T) {
+			var l rateLimiter
+			l.observe(http.Header{
+				"X-Ratelimit-Remaining": []string{tt.remaining},
+				"X-Ratelimit-Reset":     []string{tt.reset},
+			})
+
+			if l.known != tt.wantKnown {
+				t.Fatalf("known = %v; want %v", l.known, tt.wantKnown)
+			}
+			if tt.wantKnown && l.reset.Sub(tt.wantReset).Abs() > 2*time.Second {
+				t.Errorf("reset = %v; want about %v", l.reset, tt.wantReset)
+			}
+		})
+	}
+}